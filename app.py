@@ -2,39 +2,173 @@
 Interview Scheduler Flask Application
 """
 
-from flask import Flask, render_template, request, jsonify, Response
-import csv
-import io
 import os
+
+# Opt-in cooperative workers for long-running deployments (install
+# requirements-gevent.txt), e.g.
+#   GEVENT_PATCH=1 gunicorn -k gevent -w 4 --worker-connections 1000 app:app
+# Patching has to happen before Flask/SQLAlchemy import socket and threading.
+if os.environ.get('GEVENT_PATCH'):
+    from gevent import monkey
+    monkey.patch_all()
+    # Let psycopg2 yield to the gevent hub while waiting on Postgres
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+
+from flask import Flask, abort, render_template, request, jsonify, Response, send_file
+from flask.json.provider import DefaultJSONProvider
+import csv
+import orjson
+from collections import defaultdict
+if os.environ.get('GEVENT_PATCH'):
+    # Patched threads are greenlets, and a CP-SAT solve would block the hub;
+    # gevent's executor runs solves on real OS threads instead
+    from gevent.threadpool import ThreadPoolExecutor
+else:
+    from concurrent.futures import ThreadPoolExecutor
+from functools import cache, lru_cache
+from itertools import zip_longest
 import random
 import string
-import pandas as pd
+import tempfile
 from dotenv import load_dotenv
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import undefer_group
 from solver import solve_schedule, validate_schedule
-from database import db, init_db, Event, Student, Interviewer, Schedule
+from database import (
+    db, init_db, utcnow, Event, Student, Interviewer, Schedule,
+    STUDENT_DICT_COLUMNS, INTERVIEWER_DICT_COLUMNS
+)
 
 # Load environment variables from .env file (for local development)
 load_dotenv()
 
-def get_table_letter(index):
-    """Generate A, B, C... AA, AB..."""
-    # Simple implementation for typical class sizes (A-Z)
-    if index < 26:
-        return string.ascii_uppercase[index]
-    else:
-        return f"{string.ascii_uppercase[index // 26 - 1]}{string.ascii_uppercase[index % 26]}"
+# Table labels for physical interviewers: A..Z then AA..ZZ, built once at import
+TABLE_LETTERS = tuple(string.ascii_uppercase) + tuple(
+    a + b for a in string.ascii_uppercase for b in string.ascii_uppercase
+)
+
+
+def fetch_dicts(columns, *criteria):
+    """Run a column-only SELECT and return plain dicts keyed like to_dict()."""
+    stmt = select(*columns.values()).where(*criteria).order_by(columns['id'])
+    return [dict(zip(columns, row)) for row in db.session.execute(stmt)]
+
+
+def drop_existing_names(rows, model, event_id):
+    """Drop rows whose name already exists for the event (or appears earlier in
+    the batch), so re-running a bulk upload doesn't create duplicates.
+    
+    Returns the rows to insert and the names that were skipped.
+    """
+    seen = set(db.session.scalars(select(model.name).where(model.event_id == event_id)))
+    unique_rows = []
+    skipped = []
+    for row in rows:
+        if row['name'] in seen:
+            skipped.append(row['name'])
+        else:
+            seen.add(row['name'])
+            unique_rows.append(row)
+    return unique_rows, skipped
+
+
+def get_json():
+    """Parse the JSON request body with orjson.
+    
+    Bodies over MAX_CONTENT_LENGTH are rejected with 413 before any parsing.
+    """
+    try:
+        return orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        abort(400, description='Request body must be valid JSON')
+
+
+def as_int(value):
+    """int(value), skipping the call for the usual case of a JSON integer."""
+    return value if type(value) is int else int(value)
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (C serializer/parser)."""
+    
+    # Sorted keys match Flask's default provider; the UI's row order depends on it
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping the str round trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype
+        )
+
+
+# CP-SAT releases the GIL while searching, so solves run on this pool and the
+# request thread does its database work in the meantime. The pool size also
+# caps how many solves compete for the CPU at once in one process.
+SOLVER_THREADS = 4
+solver_pool = ThreadPoolExecutor(max_workers=SOLVER_THREADS, thread_name_prefix='solver')
 
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+app.config['MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024  # Largest accepted request body (bytes)
 
 # Initialize database
 init_db(app)
 
 
+def touch_event(event_id):
+    """Bump the event's updated_at, the version its conditional GETs check.
+    
+    Called by every write to an event's students, interviewers or schedules.
+    """
+    db.session.execute(update(Event).where(Event.id == event_id).values(updated_at=utcnow()))
+
+
+def event_etag(kind, event_id):
+    """ETag for a view of one event's data, or None if there is no such event."""
+    version = db.session.execute(
+        select(Event.updated_at).where(Event.id == event_id)
+    ).scalar_one_or_none()
+    if version is None:
+        return None
+    return f'{kind}-{event_id}-{version.isoformat()}'
+
+
+def not_modified(etag):
+    """304 for a client whose cached copy carries this ETag, else None.
+    
+    Views check this before loading their data, so a revalidation costs one
+    version lookup instead of the full query and serialization.
+    """
+    if etag is not None and etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+@cache
+def render_index():
+    """Render the UI page once per process; the template takes no context."""
+    return render_template('index.html')
+
+
 @app.route('/')
 def index():
     """Serve the main UI."""
-    return render_template('index.html')
+    # Re-render in debug mode so template edits show up without a restart
+    if app.debug:
+        return render_template('index.html')
+    return render_index()
 
 
 # =============================================================================
@@ -43,15 +177,40 @@ def index():
 
 @app.route('/api/events', methods=['GET'])
 def list_events():
-    """List all events."""
-    events = Event.query.order_by(Event.year.desc(), Event.name).all()
-    return jsonify([e.to_dict() for e in events])
+    """List events; ?limit= (max 500) and ?offset= page through them."""
+    # Every change to an event or its data bumps its updated_at, and adding or
+    # deleting an event moves the count, so these two aggregates version the list
+    count, latest = db.session.execute(select(func.count(), func.max(Event.updated_at))).one()
+    etag = f'events-{count}-{latest.isoformat() if latest else ""}'
+    if response := not_modified(etag):
+        return response
+    
+    # Child counts ride along as subqueries in the same SELECT
+    stmt = (
+        select(Event)
+        .options(undefer_group('counts'))
+        .order_by(Event.year.desc(), Event.name)
+    )
+    
+    # Unpaginated unless asked, since the UI loads the full event list
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        stmt = stmt.limit(max(min(limit, 500), 0))
+    offset = request.args.get('offset', type=int)
+    if offset:
+        stmt = stmt.offset(max(offset, 0))
+    
+    events = db.session.scalars(stmt).all()
+    
+    response = jsonify([e.to_dict() for e in events])
+    response.set_etag(etag)
+    return response
 
 
 @app.route('/api/events', methods=['POST'])
 def create_event():
     """Create a new event."""
-    data = request.json
+    data = get_json()
     
     event = Event(
         name=data.get('name', 'New Event'),
@@ -68,24 +227,46 @@ def create_event():
 @app.route('/api/events/<int:event_id>', methods=['GET'])
 def get_event(event_id):
     """Get a single event with all its data."""
-    event = Event.query.get_or_404(event_id)
+    etag = event_etag('event', event_id)
+    if etag is None:
+        abort(404)
+    if response := not_modified(etag):
+        return response
+    
+    event = db.get_or_404(Event, event_id)
     
-    result = event.to_dict()
-    result['students'] = [s.to_dict() for s in event.students]
-    result['interviewers'] = [i.to_dict() for i in event.interviewers]
+    # Column-only selects: no ORM objects are built for the child rows
+    students = fetch_dicts(STUDENT_DICT_COLUMNS, Student.event_id == event_id)
+    interviewers = fetch_dicts(INTERVIEWER_DICT_COLUMNS, Interviewer.event_id == event_id)
     
     # Get the most recent schedule if any
-    latest_schedule = Schedule.query.filter_by(event_id=event_id).order_by(Schedule.created_at.desc()).first()
+    latest_schedule = db.session.execute(
+        select(Schedule)
+        .options(undefer_group('blob'))
+        .where(Schedule.event_id == event_id)
+        .order_by(Schedule.created_at.desc(), Schedule.id.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+    
+    result = event.to_dict(
+        student_count=len(students),
+        interviewer_count=len(interviewers),
+        has_schedule=latest_schedule is not None
+    )
+    result['students'] = students
+    result['interviewers'] = interviewers
     result['schedule'] = latest_schedule.to_dict() if latest_schedule else None
     
-    return jsonify(result)
+    response = jsonify(result)
+    response.set_etag(etag)
+    return response
 
 
 @app.route('/api/events/<int:event_id>', methods=['PUT'])
 def update_event(event_id):
     """Update an event."""
     event = Event.query.get_or_404(event_id)
-    data = request.json
+    data = get_json()
     
     if 'name' in data:
         event.name = data['name']
@@ -101,8 +282,13 @@ def update_event(event_id):
 @app.route('/api/events/<int:event_id>', methods=['DELETE'])
 def delete_event(event_id):
     """Delete an event and all related data."""
-    event = Event.query.get_or_404(event_id)
-    db.session.delete(event)
+    Event.query.get_or_404(event_id)
+    # Bulk DELETEs so child rows are never loaded into the session; the
+    # explicit child deletes also cover databases created before the
+    # ON DELETE CASCADE foreign keys were added
+    for model in (Schedule, Interviewer, Student):
+        db.session.execute(delete(model).where(model.event_id == event_id))
+    db.session.execute(delete(Event).where(Event.id == event_id))
     db.session.commit()
     return jsonify({'success': True})
 
@@ -114,15 +300,22 @@ def delete_event(event_id):
 @app.route('/api/events/<int:event_id>/students', methods=['GET'])
 def list_students(event_id):
     """List all students for an event."""
+    etag = event_etag('students', event_id)
+    if response := not_modified(etag):
+        return response
+    
     students = Student.query.filter_by(event_id=event_id).all()
-    return jsonify([s.to_dict() for s in students])
+    response = jsonify([s.to_dict() for s in students])
+    if etag is not None:
+        response.set_etag(etag)
+    return response
 
 
 @app.route('/api/events/<int:event_id>/students', methods=['POST'])
 def add_student(event_id):
     """Add a student to an event."""
     Event.query.get_or_404(event_id)  # Verify event exists
-    data = request.json
+    data = get_json()
     
     student = Student(
         event_id=event_id,
@@ -131,6 +324,7 @@ def add_student(event_id):
     )
     
     db.session.add(student)
+    touch_event(event_id)
     db.session.commit()
     
     return jsonify(student.to_dict()), 201
@@ -138,52 +332,74 @@ def add_student(event_id):
 
 @app.route('/api/events/<int:event_id>/students/bulk', methods=['POST'])
 def bulk_add_students(event_id):
-    """Bulk add students to an event."""
+    """Bulk add students; responds with the added rows and the skipped duplicate names."""
     Event.query.get_or_404(event_id)
-    data = request.json
+    data = get_json()
     
     students_data = data.get('students', [])
     default_target = data.get('default_target', 6)
     
-    added = []
+    rows = []
     for s in students_data:
         if isinstance(s, str):
             # Just a name
-            student = Student(event_id=event_id, name=s, target_interviews=default_target)
+            rows.append({'event_id': event_id, 'name': s, 'target_interviews': default_target})
         else:
             # Object with name and possibly target
-            student = Student(
-                event_id=event_id, 
-                name=s.get('name', 'Unknown'),
-                target_interviews=s.get('target', default_target)
-            )
-        db.session.add(student)
-        added.append(student)
-    
+            rows.append({
+                'event_id': event_id,
+                'name': s.get('name', 'Unknown'),
+                'target_interviews': s.get('target', default_target)
+            })
+    
+    rows, skipped = drop_existing_names(rows, Student, event_id)
+    if not rows:
+        return jsonify({'added': [], 'skipped': skipped}), 201
+    
+    # Single bulk INSERT ... RETURNING instead of per-row unit-of-work flushes
+    added = db.session.scalars(insert(Student).returning(Student, sort_by_parameter_order=True), rows)
+    # Serialize before commit, which would expire every row and force a reload each
+    result = [s.to_dict() for s in added]
+    
+    touch_event(event_id)
     db.session.commit()
-    return jsonify([s.to_dict() for s in added]), 201
+    return jsonify({'added': result, 'skipped': skipped}), 201
 
 
 @app.route('/api/events/<int:event_id>/students/<int:student_id>', methods=['PUT'])
 def update_student(event_id, student_id):
     """Update a student."""
-    student = Student.query.filter_by(id=student_id, event_id=event_id).first_or_404()
-    data = request.json
+    data = get_json()
     
+    changes = {}
     if 'name' in data:
-        student.name = data['name']
+        changes['name'] = data['name']
     if 'target' in data:
-        student.target_interviews = data['target']
+        changes['target_interviews'] = data['target']
     
+    # UPDATE ... RETURNING: one round trip that also tells us if the row exists
+    criteria = (Student.id == student_id, Student.event_id == event_id)
+    if changes:
+        stmt = update(Student).where(*criteria).values(**changes).returning(Student)
+    else:
+        stmt = select(Student).where(*criteria)
+    # Serialize before commit, which would expire the row and force a reload
+    result = db.one_or_404(stmt).to_dict()
+    
+    touch_event(event_id)
     db.session.commit()
-    return jsonify(student.to_dict())
+    return jsonify(result)
 
 
 @app.route('/api/events/<int:event_id>/students/<int:student_id>', methods=['DELETE'])
 def delete_student(event_id, student_id):
     """Delete a student."""
-    student = Student.query.filter_by(id=student_id, event_id=event_id).first_or_404()
-    db.session.delete(student)
+    db.one_or_404(
+        delete(Student)
+        .where(Student.id == student_id, Student.event_id == event_id)
+        .returning(Student.id)
+    )
+    touch_event(event_id)
     db.session.commit()
     return jsonify({'success': True})
 
@@ -191,7 +407,8 @@ def delete_student(event_id, student_id):
 @app.route('/api/events/<int:event_id>/students', methods=['DELETE'])
 def clear_students(event_id):
     """Clear all students for an event."""
-    Student.query.filter_by(event_id=event_id).delete()
+    Student.query.filter_by(event_id=event_id).delete(synchronize_session=False)
+    touch_event(event_id)
     db.session.commit()
     return jsonify({'success': True})
 
@@ -203,15 +420,22 @@ def clear_students(event_id):
 @app.route('/api/events/<int:event_id>/interviewers', methods=['GET'])
 def list_interviewers(event_id):
     """List all interviewers for an event."""
+    etag = event_etag('interviewers', event_id)
+    if response := not_modified(etag):
+        return response
+    
     interviewers = Interviewer.query.filter_by(event_id=event_id).all()
-    return jsonify([i.to_dict() for i in interviewers])
+    response = jsonify([i.to_dict() for i in interviewers])
+    if etag is not None:
+        response.set_etag(etag)
+    return response
 
 
 @app.route('/api/events/<int:event_id>/interviewers', methods=['POST'])
 def add_interviewer(event_id):
     """Add an interviewer to an event."""
     Event.query.get_or_404(event_id)
-    data = request.json
+    data = get_json()
     
     interviewer = Interviewer(
         event_id=event_id,
@@ -220,6 +444,7 @@ def add_interviewer(event_id):
     )
     
     db.session.add(interviewer)
+    touch_event(event_id)
     db.session.commit()
     
     return jsonify(interviewer.to_dict()), 201
@@ -227,50 +452,70 @@ def add_interviewer(event_id):
 
 @app.route('/api/events/<int:event_id>/interviewers/bulk', methods=['POST'])
 def bulk_add_interviewers(event_id):
-    """Bulk add interviewers to an event."""
+    """Bulk add interviewers; responds with the added rows and the skipped duplicate names."""
     Event.query.get_or_404(event_id)
-    data = request.json
+    data = get_json()
     
     interviewers_data = data.get('interviewers', [])
     default_virtual = data.get('is_virtual', False)
     
-    added = []
+    rows = []
     for i in interviewers_data:
         if isinstance(i, str):
-            interviewer = Interviewer(event_id=event_id, name=i, is_virtual=default_virtual)
+            rows.append({'event_id': event_id, 'name': i, 'is_virtual': default_virtual})
         else:
-            interviewer = Interviewer(
-                event_id=event_id, 
-                name=i.get('name', 'Unknown'),
-                is_virtual=i.get('is_virtual', default_virtual)
-            )
-        db.session.add(interviewer)
-        added.append(interviewer)
+            rows.append({
+                'event_id': event_id,
+                'name': i.get('name', 'Unknown'),
+                'is_virtual': i.get('is_virtual', default_virtual)
+            })
     
+    rows, skipped = drop_existing_names(rows, Interviewer, event_id)
+    if not rows:
+        return jsonify({'added': [], 'skipped': skipped}), 201
+    
+    added = db.session.scalars(insert(Interviewer).returning(Interviewer, sort_by_parameter_order=True), rows)
+    # Serialize before commit, which would expire every row and force a reload each
+    result = [i.to_dict() for i in added]
+    
+    touch_event(event_id)
     db.session.commit()
-    return jsonify([i.to_dict() for i in added]), 201
+    return jsonify({'added': result, 'skipped': skipped}), 201
 
 
 @app.route('/api/events/<int:event_id>/interviewers/<int:interviewer_id>', methods=['PUT'])
 def update_interviewer(event_id, interviewer_id):
     """Update an interviewer."""
-    interviewer = Interviewer.query.filter_by(id=interviewer_id, event_id=event_id).first_or_404()
-    data = request.json
+    data = get_json()
     
+    changes = {}
     if 'name' in data:
-        interviewer.name = data['name']
+        changes['name'] = data['name']
     if 'is_virtual' in data:
-        interviewer.is_virtual = data['is_virtual']
+        changes['is_virtual'] = data['is_virtual']
+    
+    criteria = (Interviewer.id == interviewer_id, Interviewer.event_id == event_id)
+    if changes:
+        stmt = update(Interviewer).where(*criteria).values(**changes).returning(Interviewer)
+    else:
+        stmt = select(Interviewer).where(*criteria)
+    # Serialize before commit, which would expire the row and force a reload
+    result = db.one_or_404(stmt).to_dict()
     
+    touch_event(event_id)
     db.session.commit()
-    return jsonify(interviewer.to_dict())
+    return jsonify(result)
 
 
 @app.route('/api/events/<int:event_id>/interviewers/<int:interviewer_id>', methods=['DELETE'])
 def delete_interviewer(event_id, interviewer_id):
     """Delete an interviewer."""
-    interviewer = Interviewer.query.filter_by(id=interviewer_id, event_id=event_id).first_or_404()
-    db.session.delete(interviewer)
+    db.one_or_404(
+        delete(Interviewer)
+        .where(Interviewer.id == interviewer_id, Interviewer.event_id == event_id)
+        .returning(Interviewer.id)
+    )
+    touch_event(event_id)
     db.session.commit()
     return jsonify({'success': True})
 
@@ -278,7 +523,8 @@ def delete_interviewer(event_id, interviewer_id):
 @app.route('/api/events/<int:event_id>/interviewers', methods=['DELETE'])
 def clear_interviewers(event_id):
     """Clear all interviewers for an event."""
-    Interviewer.query.filter_by(event_id=event_id).delete()
+    Interviewer.query.filter_by(event_id=event_id).delete(synchronize_session=False)
+    touch_event(event_id)
     db.session.commit()
     return jsonify({'success': True})
 
@@ -290,19 +536,35 @@ def clear_interviewers(event_id):
 @app.route('/api/events/<int:event_id>/schedule', methods=['GET'])
 def get_schedule(event_id):
     """Get the most recent schedule for an event."""
-    schedule = Schedule.query.filter_by(event_id=event_id).order_by(Schedule.created_at.desc()).first()
-    
-    if not schedule:
+    latest = db.session.execute(
+        select(Schedule.id, Schedule.created_at)
+        .where(Schedule.event_id == event_id)
+        .order_by(Schedule.created_at.desc(), Schedule.id.desc())
+        .limit(1)
+    ).one_or_none()
+    
+    if latest is None:
         return jsonify({'error': 'No schedule found'}), 404
+    schedule_id, created_at = latest
+    
+    # Saved schedules are never modified, so the row is its own version and a
+    # revalidating client is answered before the JSON blobs are read. The id
+    # alone is not enough: SQLite reuses rowids after a clear
+    etag = f'schedule-{schedule_id}-{created_at.isoformat()}'
+    if response := not_modified(etag):
+        return response
     
-    return jsonify(schedule.to_dict())
+    schedule = db.session.get(Schedule, schedule_id, options=[undefer_group('blob')])
+    response = jsonify(schedule.to_dict())
+    response.set_etag(etag)
+    return response
 
 
 @app.route('/api/events/<int:event_id>/schedule', methods=['POST'])
 def save_schedule(event_id):
     """Save a schedule for an event."""
     Event.query.get_or_404(event_id)
-    data = request.json
+    data = get_json()
     
     schedule = Schedule(
         event_id=event_id,
@@ -314,6 +576,7 @@ def save_schedule(event_id):
     )
     
     db.session.add(schedule)
+    touch_event(event_id)
     db.session.commit()
     
     return jsonify(schedule.to_dict()), 201
@@ -322,7 +585,8 @@ def save_schedule(event_id):
 @app.route('/api/events/<int:event_id>/schedule', methods=['DELETE'])
 def clear_schedule(event_id):
     """Clear all schedules for an event."""
-    Schedule.query.filter_by(event_id=event_id).delete()
+    Schedule.query.filter_by(event_id=event_id).delete(synchronize_session=False)
+    touch_event(event_id)
     db.session.commit()
     return jsonify({'success': True})
 
@@ -334,51 +598,51 @@ def clear_schedule(event_id):
 @app.route('/api/solve', methods=['POST'])
 def solve():
     """Run the scheduler with provided configuration."""
-    data = request.json
+    data = get_json()
     
     event_id = data.get('event_id')
     
     # Parse students
-    students = []
-    for s in data.get('students', []):
-        students.append({
-            'name': s['name'],
-            'target': int(s.get('target', 6))
-        })
-    
-    # Parse interviewers & Assign IDs
-    interviewers = []
-    
-    phys_count = 0
-    virt_count = 0
-    
-    for inv in data.get('interviewers', []):
-        is_virtual = inv.get('is_virtual', False)
-        if is_virtual:
-            virt_count += 1
-            assigned_id = f"Z-{virt_count}"
-        else:
-            assigned_id = get_table_letter(phys_count)
-            phys_count += 1
-            
-        interviewers.append({
-            'name': inv['name'],
-            'is_virtual': is_virtual,
-            'id': assigned_id
-        })
-    
-    num_slots = int(data.get('num_slots', 13))
-    breaks_min = int(data.get('breaks_min', 1))
-    breaks_max = int(data.get('breaks_max', breaks_min))
-    
-    min_virtual = int(data.get('min_virtual_per_student', 1))
-    max_virtual = int(data.get('max_virtual_per_student', min_virtual))
+    students = [
+        {'name': s['name'], 'target': as_int(s.get('target', 6))}
+        for s in data.get('students', [])
+    ]
+    
+    # Parse interviewers into parallel lists in request order, which is the
+    # solver's input order (and part of its cache key)
+    raw_interviewers = data.get('interviewers', [])
+    inv_names = [inv['name'] for inv in raw_interviewers]
+    inv_is_virtual = [inv.get('is_virtual', False) for inv in raw_interviewers]
+    
+    # Partition the positions by type, then hand out IDs by rank within each
+    # group: A, B, ... for tables and Z-1, Z-2, ... for virtual
+    physical_idx = [idx for idx, is_virtual in enumerate(inv_is_virtual) if not is_virtual]
+    virtual_idx = [idx for idx, is_virtual in enumerate(inv_is_virtual) if is_virtual]
+    
+    inv_ids = [None] * len(inv_names)
+    for rank, idx in enumerate(physical_idx):
+        inv_ids[idx] = TABLE_LETTERS[rank]
+    for rank, idx in enumerate(virtual_idx, 1):
+        inv_ids[idx] = f"Z-{rank}"
+    
+    # Record view for the solver and validator
+    interviewers = [
+        {'name': name, 'is_virtual': is_virtual, 'id': inv_id}
+        for name, inv_id, is_virtual in zip(inv_names, inv_ids, inv_is_virtual)
+    ]
+    
+    num_slots = as_int(data.get('num_slots', 13))
+    breaks_min = as_int(data.get('breaks_min', 1))
+    breaks_max = as_int(data.get('breaks_max', breaks_min))
+    
+    min_virtual = as_int(data.get('min_virtual_per_student', 1))
+    max_virtual = as_int(data.get('max_virtual_per_student', min_virtual))
     
     auto_balance = data.get('auto_balance', False)
     seed = data.get('seed')
     
     if seed is not None:
-        seed = int(seed)
+        seed = as_int(seed)
     else:
         seed = random.randint(0, 100000)
     
@@ -393,20 +657,29 @@ def solve():
             deficit = current_demand - total_capacity
             rng = random.Random(seed)
             
-            for _ in range(deficit):
-                candidates = [s for s in students if s['target'] > 1]
-                if not candidates:
+            # Bucket students by target and trim the highest bucket with one
+            # random sample per level. Same outcome as repeatedly decrementing
+            # a random student with the highest target, in O(N + deficit).
+            buckets = defaultdict(list)
+            for idx, s in enumerate(students):
+                buckets[s['target']].append(idx)
+            
+            while deficit > 0 and buckets:
+                top = max(buckets)
+                if top <= 1:
                     break
-                    
-                max_target = max(s['target'] for s in candidates)
-                highest_candidates = [s for s in candidates if s['target'] == max_target]
                 
-                victim = rng.choice(highest_candidates)
-                victim['target'] -= 1
+                bucket = buckets.pop(top)
+                victims = rng.sample(bucket, min(len(bucket), deficit))
+                for idx in victims:
+                    students[idx]['target'] -= 1
+                buckets[top - 1].extend(victims)
+                deficit -= len(victims)
 
     
     # Solve
-    result = solve_schedule(
+    solve_future = solver_pool.submit(
+        solve_schedule,
         students=students,
         interviewers=interviewers,
         num_slots=num_slots,
@@ -417,6 +690,17 @@ def solve():
         seed=seed
     )
     
+    # Look up student IDs for the auto-balanced target update while the
+    # solver runs, taking the round trip off the critical path
+    student_ids = {}
+    if event_id and auto_balance:
+        rows = db.session.execute(
+            select(Student.id, Student.name).where(Student.event_id == event_id)
+        ).all()
+        student_ids = {name: student_id for student_id, name in rows}
+    
+    result = solve_future.result()
+    
     # Add validation if successful
     if result['success']:
         errors = validate_schedule(
@@ -427,29 +711,29 @@ def solve():
         result['students_used'] = students
         
         # Process Interviewer Assignments (Table IDs & Breaks)
-        inv_assignments = []
         inv_schedule = result.get('interviewer_schedule', {})
         
-        inv_map = {i['name']: i for i in interviewers}
+        inv_name_to_idx = {name: idx for idx, name in enumerate(inv_names)}
         
-        for name, slots in inv_schedule.items():
-            break_indices = [i + 1 for i, s in enumerate(slots) if s == "BREAK"]
-            
-            if not break_indices:
-                break_display = "None"
-            else:
-                break_display = ", ".join(map(str, break_indices))
-            
-            inv_obj = inv_map.get(name)
-            if inv_obj:
-                inv_assignments.append({
+        # The solver keeps request order, and IDs are handed out in that order
+        # within each group, so a stable sort on the type alone gives A, B,
+        # ... Z, AA, ... then Z-1, Z-2, ... Z-10 without comparing ID strings
+        # ('AA' < 'B', 'Z-10' < 'Z-2')
+        inv_assignments = sorted(
+            (
+                {
                     'name': name,
-                    'id': inv_obj['id'],
-                    'is_virtual': inv_obj['is_virtual'],
-                    'break_slot': break_display
-                })
-        
-        inv_assignments.sort(key=lambda x: x['id'])
+                    'id': inv_ids[idx],
+                    'is_virtual': inv_is_virtual[idx],
+                    'break_slot': ", ".join(
+                        str(t + 1) for t, s in enumerate(slots) if s == "BREAK"
+                    ) or "None"
+                }
+                for name, slots in inv_schedule.items()
+                if (idx := inv_name_to_idx.get(name)) is not None
+            ),
+            key=lambda assignment: bool(assignment['is_virtual'])
+        )
         result['interviewer_assignments'] = inv_assignments
         
         # Auto-save schedule if event_id provided
@@ -472,11 +756,15 @@ def solve():
             
             # Also update student targets if auto-balanced
             if auto_balance:
-                for s_data in students:
-                    student = Student.query.filter_by(event_id=event_id, name=s_data['name']).first()
-                    if student:
-                        student.target_interviews = s_data['target']
+                mappings = [
+                    {'id': student_ids[s_data['name']], 'target_interviews': s_data['target']}
+                    for s_data in students if s_data['name'] in student_ids
+                ]
+                if mappings:
+                    # Bulk UPDATE by primary key in one round trip
+                    db.session.execute(update(Student), mappings)
             
+            touch_event(event_id)
             db.session.commit()
 
     
@@ -487,40 +775,81 @@ def solve():
 # Export Endpoint
 # =============================================================================
 
+EXPORT_SPOOL_SIZE = 8 * 1024 * 1024  # Bytes kept in memory before spilling to disk
+BREAK_LABEL = 'Break'  # Shown for empty slots in both export formats
+
+
+@lru_cache(maxsize=32)
+def export_headers(num_slots):
+    """Header row for a schedule export, built once per slot count."""
+    return ('Student Name',) + tuple(f'Slot {i+1}' for i in range(num_slots)) + ('Total',)
+
+
+def export_row(name, slots):
+    """One export line: student name, each slot (BREAK_LABEL when empty), total."""
+    row = [name]
+    total = 0
+    for s in slots:
+        if s:
+            row.append(s)
+            total += 1
+        else:
+            row.append(BREAK_LABEL)
+    row.append(total)
+    return row
+
+
+class EchoWriter:
+    """File-like object whose write() hands back the line, so csv.writer
+    rows can be yielded from a streaming response."""
+    
+    def write(self, value):
+        return value
+
+
 @app.route('/api/export', methods=['POST'])
 def export_schedule():
     """Export schedule as Excel (styled) or CSV."""
-    data = request.json
+    data = get_json()
     schedule = data.get('schedule', {})
     num_slots = int(data.get('num_slots', 13))
 
-    headers = ['Student Name'] + [f'Slot {i+1}' for i in range(num_slots)] + ['Total']
-    rows = []
+    headers = export_headers(num_slots)
     
-    virtual_interviewers = set(data.get('virtual_interviewers', []))
-
-    for name, slots in schedule.items():
-        row_data = [name]
-        count = 0
-        for s in slots:
-            if s:
-                row_data.append(s)
-                count += 1
-            else:
-                row_data.append('BREAK')
+    if data.get('format') == 'csv':
+        # Stream one CSV line per student instead of buffering the file
+        def generate():
+            writer = csv.writer(EchoWriter())
+            yield writer.writerow(headers)
+            for name, slots in schedule.items():
+                yield writer.writerow(export_row(name, slots))
         
-        row_data.append(count)
-        rows.append(row_data)
+        return Response(
+            generate(),
+            mimetype='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=Interview_Schedule.csv'}
+        )
+    
+    # Imported here so cold starts and CSV exports don't pay for loading
+    # the xlsx writer
+    import xlsxwriter
+    
+    # Cell styling is done by conditional formats below, so building the
+    # rows needs no per-cell break/virtual checks
+    rows = [export_row(name, slots) for name, slots in schedule.items()]
+    
+    virtual_interviewers = list(dict.fromkeys(data.get('virtual_interviewers', [])))
 
-    df = pd.DataFrame(rows, columns=headers)
+    last_row = len(rows)
 
-    output = io.BytesIO()
+    # Spills to disk past EXPORT_SPOOL_SIZE and is streamed back by send_file,
+    # so the finished workbook is never copied into a second bytes object
+    output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
     
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, sheet_name='Schedule', index=False, startrow=1)
-        
-        workbook = writer.book
-        worksheet = writer.sheets['Schedule']
+    # constant_memory flushes each row as soon as the next one starts, so
+    # rows have to be written top to bottom: header first, then the data
+    with xlsxwriter.Workbook(output, {'constant_memory': True, 'strings_to_urls': False}) as workbook:
+        worksheet = workbook.add_worksheet('Schedule')
         
         header_format = workbook.add_format({
             'bold': True,
@@ -553,34 +882,125 @@ def export_schedule():
             'bg_color': '#F8F8F8'
         })
 
-        for col_num, value in enumerate(df.columns.values):
-            worksheet.write(0, col_num, value, header_format)
-
-        for row_num, row_data in enumerate(rows):
-            worksheet.write(row_num + 1, 0, row_data[0], name_format)
+        worksheet.write_row(0, 0, headers, header_format)
+        
+        # Column widths from the longest value in each column, in place of
+        # autofit re-reading every written cell
+        columns = zip_longest(headers, *rows, fillvalue='')
+        for col_num, column in enumerate(columns):
+            worksheet.set_column(col_num, col_num, max(len(str(v)) for v in column) + 2)
+        
+        for row_num, row_data in enumerate(rows, start=1):
+            worksheet.write_row(row_num, 0, row_data)
+
+        if rows:
+            # Style whole ranges with conditional formats instead of
+            # rewriting every cell. Rules added first take priority.
+            worksheet.conditional_format(1, 1, last_row, num_slots, {
+                'type': 'cell',
+                'criteria': '==',
+                'value': f'"{BREAK_LABEL}"',
+                'format': break_format
+            })
             
-            for col_num in range(1, num_slots + 1):
-                cell_val = row_data[col_num]
-                
-                if cell_val == 'BREAK':
-                    worksheet.write(row_num + 1, col_num, "Break", break_format)
-                elif cell_val in virtual_interviewers:
-                    worksheet.write(row_num + 1, col_num, cell_val, virtual_format)
-                else:
-                    worksheet.write(row_num + 1, col_num, cell_val, cell_format)
+            if virtual_interviewers:
+                # Virtual names live on a hidden sheet so one formula rule
+                # covers the whole slot range
+                lists_sheet = workbook.add_worksheet('Lists')
+                lists_sheet.write_column(0, 0, virtual_interviewers)
+                lists_sheet.hide()
+                workbook.define_name(
+                    'VirtualInterviewers',
+                    f"=Lists!$A$1:$A${len(virtual_interviewers)}"
+                )
+                worksheet.conditional_format(1, 1, last_row, num_slots, {
+                    'type': 'formula',
+                    'criteria': '=ISNUMBER(MATCH(B2,VirtualInterviewers,0))',
+                    'format': virtual_format
+                })
             
-            worksheet.write(row_num + 1, num_slots + 1, row_data[-1], name_format)
-
-        worksheet.autofit()
+            worksheet.conditional_format(1, 1, last_row, num_slots, {
+                'type': 'no_errors',
+                'format': cell_format
+            })
+            for col_num in (0, num_slots + 1):
+                worksheet.conditional_format(1, col_num, last_row, col_num, {
+                    'type': 'no_errors',
+                    'format': name_format
+                })
 
     output.seek(0)
     
-    return Response(
-        output.getvalue(),
+    return send_file(
+        output,
         mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={'Content-Disposition': 'attachment; filename=Interview_Schedule.xlsx'}
+        as_attachment=True,
+        download_name='Interview_Schedule.xlsx'
     )
 
 
+# =============================================================================
+# Batch Endpoint
+# =============================================================================
+
+MAX_BATCH_REQUESTS = 20
+
+
+@app.route('/api/batch', methods=['POST'])
+def batch():
+    """Run several API calls in one HTTP round trip.
+    
+    Body: {"requests": {key: {"method": "GET", "path": "/api/...", "body": {...}}}}
+    Returns {key: {"status": int, "body": parsed JSON or null}}, in order.
+    """
+    data = get_json()
+    sub_requests = data.get('requests', {})
+    
+    if not isinstance(sub_requests, dict):
+        return jsonify({'error': 'requests must be an object'}), 400
+    if len(sub_requests) > MAX_BATCH_REQUESTS:
+        return jsonify({'error': f'At most {MAX_BATCH_REQUESTS} requests per batch'}), 400
+    
+    results = {}
+    for key, sub in sub_requests.items():
+        if not isinstance(sub, dict):
+            results[key] = {'status': 400, 'body': {'error': 'Each request must be an object'}}
+            continue
+        path = sub.get('path')
+        method = sub.get('method', 'GET')
+        if (not isinstance(path, str) or not path.startswith('/api/')
+                or path.startswith('/api/batch')):
+            results[key] = {'status': 400, 'body': {'error': 'Invalid path'}}
+            continue
+        if not isinstance(method, str):
+            results[key] = {'status': 400, 'body': {'error': 'Invalid method'}}
+            continue
+        
+        # Each call goes through the normal routing, hooks and error handlers.
+        # The request context reuses this request's app context, so it shares
+        # the database session, which its teardown does not remove
+        response = None
+        try:
+            with app.test_request_context(path, method=method.upper(), json=sub.get('body')):
+                response = app.full_dispatch_request()
+                results[key] = {
+                    'status': response.status_code,
+                    'body': response.get_json(silent=True)
+                }
+        except Exception:
+            app.logger.exception('Batch request %r failed', key)
+            results[key] = {'status': 500, 'body': {'error': 'Internal server error'}}
+        finally:
+            # The WSGI server would close a real response: this releases a
+            # streamed export's generator or send_file's spooled temp file
+            if response is not None:
+                response.close()
+            # What the session teardown does after a real request: anything a
+            # failed or read-only call left uncommitted must not leak into the next
+            db.session.rollback()
+    
+    return jsonify(results)
+
+
 if __name__ == '__main__':
     app.run(debug=True, port=5001, host='0.0.0.0')
@@ -4,11 +4,45 @@ Uses Flask-SQLAlchemy with Neon/Vercel Postgres.
 """
 
 import os
-from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import exists, func, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.pool import NullPool
 
 db = SQLAlchemy()
 
+# Binary JSONB on Postgres (parsed once on write, not on every read);
+# plain JSON everywhere else, e.g. the SQLite fallback
+JSONType = db.JSON().with_variant(JSONB(), 'postgresql')
+
+
+class utcnow(FunctionElement):
+    """Current UTC time as a naive timestamp, evaluated by the database.
+    
+    Used as the column default so INSERT/UPDATE statements carry the SQL
+    expression instead of a bound datetime built in Python.
+    """
+    type = db.DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow, 'postgresql')
+def _pg_utcnow(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, 'sqlite')
+def _sqlite_utcnow(element, compiler, **kw):
+    # UTC with milliseconds (CURRENT_TIMESTAMP stops at whole seconds)
+    return "STRFTIME('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw):
+    return 'CURRENT_TIMESTAMP'
+
 
 def init_db(app):
     """Initialize database connection with Neon/Vercel Postgres compatibility."""
@@ -30,15 +64,33 @@ def init_db(app):
             database_url += '?sslmode=require'
         elif 'sslmode' not in database_url:
             database_url += '&sslmode=require'
+        
+        # Fail fast instead of hanging a request on an unreachable database
+        if 'connect_timeout' not in database_url:
+            database_url += '&connect_timeout=10'
     else:
         # Fallback to SQLite for local development without Postgres
         database_url = 'sqlite:///interview_scheduler.db'
     
     app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-        'pool_pre_ping': True,  # Handle connection drops gracefully
-    }
+    if os.environ.get('VERCEL'):
+        # Serverless instances are short-lived and frozen between requests, so
+        # pooled sockets mostly go stale; leave pooling to Neon's pgbouncer
+        # endpoint (POSTGRES_URL) and open one connection per checkout
+        engine_options = {'poolclass': NullPool}
+    elif database_url.startswith('sqlite'):
+        engine_options = {'pool_pre_ping': True}
+    else:
+        # Long-lived server: reuse warm connections instead of paying
+        # TCP/TLS/auth per request
+        engine_options = {
+            'pool_pre_ping': True,  # Handle connection drops gracefully
+            'pool_size': 5,
+            'max_overflow': 10,
+            'pool_recycle': 300,  # Seconds; recycle before Neon's idle timeout
+        }
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
     
     db.init_app(app)
     
@@ -57,15 +109,24 @@ class Event(db.Model):
     name = db.Column(db.String(200), nullable=False)
     year = db.Column(db.Integer, nullable=False)
     is_active = db.Column(db.Boolean, default=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = db.Column(db.DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
-    students = db.relationship('Student', backref='event', lazy=True, cascade='all, delete-orphan')
-    interviewers = db.relationship('Interviewer', backref='event', lazy=True, cascade='all, delete-orphan')
-    schedules = db.relationship('Schedule', backref='event', lazy=True, cascade='all, delete-orphan')
+    students = db.relationship('Student', backref='event', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    interviewers = db.relationship('Interviewer', backref='event', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    schedules = db.relationship('Schedule', backref='event', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
     
-    def to_dict(self):
+    def to_dict(self, student_count=None, interviewer_count=None, has_schedule=None):
+        """Serialize the event; callers that already know the child counts can
+        pass them in, otherwise they come from the 'counts' column properties."""
+        if student_count is None:
+            student_count = self.student_count
+        if interviewer_count is None:
+            interviewer_count = self.interviewer_count
+        if has_schedule is None:
+            has_schedule = self.has_schedule
+        
         return {
             'id': self.id,
             'name': self.name,
@@ -73,18 +134,22 @@ class Event(db.Model):
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'student_count': len(self.students),
-            'interviewer_count': len(self.interviewers),
-            'has_schedule': len(self.schedules) > 0
+            'student_count': student_count,
+            'interviewer_count': interviewer_count,
+            'has_schedule': has_schedule
         }
 
 
+# Matches the event list's ORDER BY year DESC, name
+db.Index('ix_events_year_name', Event.year.desc(), Event.name)
+
+
 class Student(db.Model):
     """A student participating in mock interviews for a specific event."""
     __tablename__ = 'students'
     
     id = db.Column(db.Integer, primary_key=True)
-    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False, index=True)
     name = db.Column(db.String(200), nullable=False)
     target_interviews = db.Column(db.Integer, default=6)
     
@@ -102,7 +167,7 @@ class Interviewer(db.Model):
     __tablename__ = 'interviewers'
     
     id = db.Column(db.Integer, primary_key=True)
-    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False, index=True)
     name = db.Column(db.String(200), nullable=False)
     is_virtual = db.Column(db.Boolean, default=False)
     assigned_table_id = db.Column(db.String(10), nullable=True)  # A, B, C... or Z-1, Z-2...
@@ -120,15 +185,21 @@ class Interviewer(db.Model):
 class Schedule(db.Model):
     """A generated interview schedule for an event."""
     __tablename__ = 'schedules'
+    __table_args__ = (
+        # Serves the "latest schedule for an event" lookup as an index seek
+        db.Index('ix_schedule_event_created', 'event_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
-    schedule_data = db.Column(db.JSON, nullable=False)  # The full schedule: {student_name: [interviewer1, null, interviewer2, ...]}
-    interviewer_schedule = db.Column(db.JSON, nullable=True)  # {interviewer_name: [student1, "BREAK", student2, ...]}
-    interviewer_assignments = db.Column(db.JSON, nullable=True)  # Table assignments and breaks
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False)
+    # The large JSON blobs are deferred (group 'blob') so summary reads such as
+    # Event.to_dict()'s has_schedule don't fetch them; load with undefer_group('blob')
+    schedule_data = db.deferred(db.Column(JSONType, nullable=False), group='blob')  # The full schedule: {student_name: [interviewer1, null, interviewer2, ...]}
+    interviewer_schedule = db.deferred(db.Column(JSONType, nullable=True), group='blob')  # {interviewer_name: [student1, "BREAK", student2, ...]}
+    interviewer_assignments = db.deferred(db.Column(JSONType, nullable=True), group='blob')  # Table assignments and breaks
     seed_used = db.Column(db.Integer, nullable=True)
-    config = db.Column(db.JSON, nullable=True)  # {num_slots, breaks_min, breaks_max, min_virtual, max_virtual}
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    config = db.Column(JSONType, nullable=True)  # {num_slots, breaks_min, breaks_max, min_virtual, max_virtual}
+    created_at = db.Column(db.DateTime, default=utcnow(), server_default=utcnow())
     
     def to_dict(self):
         return {
@@ -141,3 +212,47 @@ class Schedule(db.Model):
             'config': self.config,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+
+# Child counts as correlated subqueries, so serializing an event never loads
+# its collections. Deferred in the 'counts' group: a single extra SELECT on
+# first access, or none when the query asks for undefer_group('counts').
+Event.student_count = db.column_property(
+    select(func.count(Student.id))
+    .where(Student.event_id == Event.id)
+    .correlate_except(Student)
+    .scalar_subquery(),
+    deferred=True,
+    group='counts'
+)
+Event.interviewer_count = db.column_property(
+    select(func.count(Interviewer.id))
+    .where(Interviewer.event_id == Event.id)
+    .correlate_except(Interviewer)
+    .scalar_subquery(),
+    deferred=True,
+    group='counts'
+)
+Event.has_schedule = db.column_property(
+    exists().where(Schedule.event_id == Event.id).correlate_except(Schedule),
+    deferred=True,
+    group='counts'
+)
+
+
+# Column projections producing the same keys as Student.to_dict() and
+# Interviewer.to_dict(), for read paths that skip ORM object hydration
+STUDENT_DICT_COLUMNS = {
+    'id': Student.id,
+    'event_id': Student.event_id,
+    'name': Student.name,
+    'target': Student.target_interviews
+}
+
+INTERVIEWER_DICT_COLUMNS = {
+    'id': Interviewer.id,
+    'event_id': Interviewer.event_id,
+    'name': Interviewer.name,
+    'is_virtual': Interviewer.is_virtual,
+    'assigned_table_id': Interviewer.assigned_table_id
+}
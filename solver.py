@@ -4,10 +4,248 @@ Interview Scheduling Solver Module
 Constraint-satisfaction solver using OR-Tools CP-SAT for zero-slack interview scheduling.
 """
 
+import copy
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+from collections import OrderedDict
 from ortools.sat.python import cp_model
 from typing import Optional
 
 
+# CP-SAT portfolio size per solve. Workers run different search strategies in
+# parallel and share learned clauses; more than 8 rarely helps on models this
+# size, and the app runs several solves at once
+SOLVER_WORKERS = min(8, os.cpu_count() or 1)
+
+# Wall-clock ceiling per solve (seconds). Hinted solves finish well inside
+# this; a request that runs out gets UNKNOWN, which is not cached and can
+# be retried, instead of holding a worker for a full minute
+SOLVER_TIME_LIMIT = 30.0
+
+
+def _native_lock():
+    """Lock for the caches below, which are only touched from solver threads.
+    
+    Under gevent monkey-patching threading.Lock is a greenlet lock, but the app
+    then runs solves on gevent's pool of real OS threads, so take the original.
+    """
+    monkey = sys.modules.get('gevent.monkey')
+    if monkey is not None and monkey.is_module_patched('threading'):
+        return monkey.get_original('_thread', 'allocate_lock')()
+    return threading.Lock()
+
+
+# Solved problems keyed by a hash of their inputs (LRU, per process)
+SOLUTION_CACHE_SIZE = 256
+_solution_cache: OrderedDict[str, dict] = OrderedDict()
+_solution_cache_lock = _native_lock()
+
+# Built CP-SAT models keyed by problem shape (LRU, per process)
+MODEL_CACHE_SIZE = 32
+_model_cache: OrderedDict[tuple, cp_model.CpModel] = OrderedDict()
+_model_cache_lock = _native_lock()
+
+# Statuses whose outcome is fully determined by the inputs and seed;
+# UNKNOWN (time limit hit) may resolve differently on a retry
+_CACHEABLE_STATUSES = {'OPTIMAL', 'FEASIBLE', 'INFEASIBLE', 'MODEL_INVALID'}
+
+
+def _problem_key(students, interviewers, num_slots, breaks_min, breaks_max,
+                 min_virtual_per_student, max_virtual_per_student, seed) -> str:
+    """Content hash of everything that influences the solver's answer."""
+    payload = json.dumps([
+        [[s['name'], s['target']] for s in students],
+        [[inv['name'], bool(inv['is_virtual'])] for inv in interviewers],
+        num_slots, breaks_min, breaks_max,
+        min_virtual_per_student, max_virtual_per_student, seed
+    ])
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _build_model(
+    targets: tuple[int, ...],
+    virtual_interviewers: tuple[int, ...],
+    num_interviewers: int,
+    num_slots: int,
+    breaks_min: int,
+    min_virtual_per_student: int,
+    max_virtual_per_student: int
+) -> cp_model.CpModel:
+    """
+    Build the CP-SAT model for one problem shape.
+    
+    Names play no part in the model, only each student's target and which
+    interviewer indices are virtual. The x[s, t, i] Booleans are the first
+    variables created, so x[s, t, i] is model variable
+    (s * num_slots + t) * num_interviewers + i.
+    """
+    num_students = len(targets)
+    
+    model = cp_model.CpModel()
+    
+    # Decision variables: x[s, t, i] = 1 if student s meets interviewer i at slot t
+    x = {}
+    for s_idx in range(num_students):
+        for t in range(num_slots):
+            for i in range(num_interviewers):
+                x[s_idx, t, i] = model.NewBoolVar(f'x_{s_idx}_{t}_{i}')
+    
+    # Breaks are not modelled as variables: an interviewer's break slots are
+    # picked from their idle slots after solving (see _solve_schedule)
+    
+    # CONSTRAINTS 1 & 2: Each interviewer stays idle for at least breaks_min
+    # slots, so those breaks can be placed
+    working_slots = num_slots - breaks_min
+    # With zero slack (demand == capacity) every interviewer must work all
+    # their working slots. That equality is implied, but stating it lets
+    # presolve fix it up front instead of deriving it during search.
+    zero_slack = sum(targets) == num_interviewers * working_slots
+    for i in range(num_interviewers):
+        workload = cp_model.LinearExpr.Sum([x[s_idx, t, i]
+                                            for s_idx in range(num_students)
+                                            for t in range(num_slots)])
+        if zero_slack:
+            model.Add(workload == working_slots)
+        else:
+            model.Add(workload <= working_slots)
+    
+    # CONSTRAINT 3: Each interviewer interviews at most 1 student per slot
+    # (AddAtMostOne goes to the SAT core instead of the linear propagator)
+    for i in range(num_interviewers):
+        for t in range(num_slots):
+            model.AddAtMostOne(x[s_idx, t, i] for s_idx in range(num_students))
+    
+    # CONSTRAINT 4: Each student interviewed at most once per slot
+    for s_idx in range(num_students):
+        for t in range(num_slots):
+            model.AddAtMostOne(x[s_idx, t, i] for i in range(num_interviewers))
+    
+    # CONSTRAINT 5: Each student gets exactly their target interviews
+    for s_idx, target in enumerate(targets):
+        student_vars = [x[s_idx, t, i]
+                        for t in range(num_slots)
+                        for i in range(num_interviewers)]
+        if target == 1:
+            model.AddExactlyOne(student_vars)
+        else:
+            model.Add(cp_model.LinearExpr.Sum(student_vars) == target)
+    
+    # CONSTRAINT 6: No student sees the same interviewer twice
+    for s_idx in range(num_students):
+        for i in range(num_interviewers):
+            model.AddAtMostOne(x[s_idx, t, i] for t in range(num_slots))
+    
+    # CONSTRAINT 7: Each student has at least min_virtual_per_student virtual interviews
+    if virtual_interviewers and min_virtual_per_student > 0:
+        for s_idx in range(num_students):
+            virtual_interviews = cp_model.LinearExpr.Sum([x[s_idx, t, i]
+                                                          for t in range(num_slots)
+                                                          for i in virtual_interviewers])
+            model.Add(virtual_interviews >= min_virtual_per_student)
+            
+            # Constraint: Max virtual interviews
+            if max_virtual_per_student >= min_virtual_per_student:
+                model.Add(virtual_interviews <= max_virtual_per_student)
+    
+    return model
+
+
+def _greedy_hint(
+    targets: list[int],
+    virtual_interviewers: list[int],
+    num_interviewers: int,
+    num_slots: int,
+    breaks_min: int,
+    min_virtual_per_student: int,
+    max_virtual_per_student: int,
+    seed: Optional[int]
+) -> list[int]:
+    """
+    Greedy slot-by-slot assignment used to warm-start CP-SAT.
+    
+    Returns a 0/1 value for every x[s, t, i], in model variable order. In each
+    slot, students with the most interviews left go first and take the
+    least-loaded free interviewer they haven't met, preferring the type they
+    still need. The seed breaks ties, so re-rolling it still varies the
+    schedule. Some targets may be left short; the solver repairs from there.
+    """
+    rng = random.Random(seed)
+    num_students = len(targets)
+    working_slots = num_slots - breaks_min
+    
+    is_virtual = [False] * num_interviewers
+    for i in virtual_interviewers:
+        is_virtual[i] = True
+    # Mirrors CONSTRAINT 7: the cap only applies alongside a minimum
+    virtual_cap = max_virtual_per_student if (
+        virtual_interviewers and 0 < min_virtual_per_student <= max_virtual_per_student
+    ) else num_slots
+    
+    remaining = list(targets)
+    virtual_count = [0] * num_students
+    workload = [0] * num_interviewers
+    met = [set() for _ in range(num_students)]
+    student_tiebreak = [rng.random() for _ in range(num_students)]
+    interviewer_tiebreak = [rng.random() for _ in range(num_interviewers)]
+    
+    values = [0] * (num_students * num_slots * num_interviewers)
+    for t in range(num_slots):
+        busy = set()
+        for s_idx in sorted(range(num_students), key=lambda s: (-remaining[s], student_tiebreak[s])):
+            if remaining[s_idx] == 0:
+                continue
+            
+            wants_virtual = virtual_count[s_idx] < min_virtual_per_student
+            candidates = [
+                i for i in range(num_interviewers)
+                if i not in busy and i not in met[s_idx] and workload[i] < working_slots
+                and not (is_virtual[i] and virtual_count[s_idx] >= virtual_cap)
+            ]
+            if not candidates:
+                continue
+            
+            i = min(candidates, key=lambda i: (is_virtual[i] != wants_virtual,
+                                               workload[i], interviewer_tiebreak[i]))
+            busy.add(i)
+            met[s_idx].add(i)
+            workload[i] += 1
+            remaining[s_idx] -= 1
+            if is_virtual[i]:
+                virtual_count[s_idx] += 1
+            values[(s_idx * num_slots + t) * num_interviewers + i] = 1
+    
+    return values
+
+
+def _get_model(targets, virtual_interviewers, num_interviewers, num_slots,
+               breaks_min, min_virtual_per_student, max_virtual_per_student) -> cp_model.CpModel:
+    """
+    A private copy of the model for this problem shape, built once and
+    cloned on later calls. Re-solving the same roster with a different
+    seed skips the Python-side model construction.
+    """
+    key = (tuple(targets), tuple(virtual_interviewers), num_interviewers, num_slots,
+           breaks_min, min_virtual_per_student, max_virtual_per_student)
+    
+    with _model_cache_lock:
+        model = _model_cache.get(key)
+        if model is not None:
+            _model_cache.move_to_end(key)
+    
+    if model is None:
+        model = _build_model(*key)
+        with _model_cache_lock:
+            _model_cache[key] = model
+            if len(_model_cache) > MODEL_CACHE_SIZE:
+                _model_cache.popitem(last=False)
+    
+    return model.Clone()
+
+
 def solve_schedule(
     students: list[dict],
     interviewers: list[dict],
@@ -17,6 +255,44 @@ def solve_schedule(
     min_virtual_per_student: int = 1,
     max_virtual_per_student: int = 1,
     seed: Optional[int] = None
+) -> dict:
+    """
+    Solve the interview scheduling problem, reusing the answer for inputs
+    that were already solved in this process.
+    
+    Takes the same arguments and returns the same dict as _solve_schedule.
+    Callers get a private copy they are free to mutate.
+    """
+    key = _problem_key(students, interviewers, num_slots, breaks_min, breaks_max,
+                       min_virtual_per_student, max_virtual_per_student, seed)
+    
+    with _solution_cache_lock:
+        cached = _solution_cache.get(key)
+        if cached is not None:
+            _solution_cache.move_to_end(key)
+            return copy.deepcopy(cached)
+    
+    result = _solve_schedule(students, interviewers, num_slots, breaks_min, breaks_max,
+                             min_virtual_per_student, max_virtual_per_student, seed)
+    
+    if result['stats'].get('status') in _CACHEABLE_STATUSES:
+        with _solution_cache_lock:
+            _solution_cache[key] = copy.deepcopy(result)
+            if len(_solution_cache) > SOLUTION_CACHE_SIZE:
+                _solution_cache.popitem(last=False)
+    
+    return result
+
+
+def _solve_schedule(
+    students: list[dict],
+    interviewers: list[dict],
+    num_slots: int = 13,
+    breaks_min: int = 1,
+    breaks_max: int = 1,
+    min_virtual_per_student: int = 1,
+    max_virtual_per_student: int = 1,
+    seed: Optional[int] = None
 ) -> dict:
     """
     Solve the interview scheduling problem.
@@ -35,16 +311,31 @@ def solve_schedule(
         dict with 'success', 'schedule', 'error', and 'stats'
     """
     
+    # Unpack the input records once into parallel lists; everything below
+    # indexes these instead of going back through the per-row dicts
+    student_names = [s['name'] for s in students]
+    targets = [s['target'] for s in students]
+    interviewer_names = [inv['name'] for inv in interviewers]
+    virtual_interviewers = [i for i, inv in enumerate(interviewers) if inv['is_virtual']]
+    num_students = len(students)
+    
     # Validate inputs
     num_interviewers = len(interviewers)
     # Capacity is based on minimum breaks (most interviews possible)
     working_slots = num_slots - breaks_min
     total_capacity = num_interviewers * working_slots
-    total_demand = sum(s['target'] for s in students)
+    total_demand = sum(targets)
     
-    virtual_interviewers = [i for i, inv in enumerate(interviewers) if inv['is_virtual']]
     virtual_capacity = len(virtual_interviewers) * working_slots
-    virtual_demand = len(students) * min_virtual_per_student
+    virtual_demand = num_students * min_virtual_per_student
+    
+    if breaks_max < breaks_min:
+        return {
+            'success': False,
+            'schedule': None,
+            'error': f'Maximum breaks ({breaks_max}) is below minimum breaks ({breaks_min}).',
+            'stats': {'breaks_min': breaks_min, 'breaks_max': breaks_max}
+        }
     
     if total_demand > total_capacity:
         return {
@@ -64,70 +355,23 @@ def solve_schedule(
             'stats': {'virtual_capacity': virtual_capacity, 'virtual_demand': virtual_demand}
         }
     
-    model = cp_model.CpModel()
-    
-    # Decision variables: x[s, t, i] = 1 if student s meets interviewer i at slot t
-    x = {}
-    for s_idx in range(len(students)):
-        for t in range(num_slots):
-            for i in range(num_interviewers):
-                x[s_idx, t, i] = model.NewBoolVar(f'x_{s_idx}_{t}_{i}')
-    
-    # Break variables: breaks[i, t] = 1 if interviewer i has break at slot t
-    breaks = {}
-    for i in range(num_interviewers):
-        for t in range(num_slots):
-            breaks[i, t] = model.NewBoolVar(f'break_{i}_{t}')
+    model = _get_model(targets, virtual_interviewers, num_interviewers, num_slots,
+                       breaks_min, min_virtual_per_student, max_virtual_per_student)
     
-    # CONSTRAINT 1: Each interviewer has breaks within [min, max]
-    for i in range(num_interviewers):
-        total_breaks = sum(breaks[i, t] for t in range(num_slots))
-        model.Add(total_breaks >= breaks_min)
-        model.Add(total_breaks <= breaks_max)
-    
-    # CONSTRAINT 2: If interviewer has break, they can't interview
-    for i in range(num_interviewers):
-        for t in range(num_slots):
-            for s_idx in range(len(students)):
-                model.Add(x[s_idx, t, i] == 0).OnlyEnforceIf(breaks[i, t])
-    
-    # CONSTRAINT 3: Each interviewer interviews at most 1 student per slot
-    for i in range(num_interviewers):
-        for t in range(num_slots):
-            model.Add(sum(x[s_idx, t, i] for s_idx in range(len(students))) <= 1)
-    
-    # CONSTRAINT 4: Each student interviewed at most once per slot
-    for s_idx in range(len(students)):
-        for t in range(num_slots):
-            model.Add(sum(x[s_idx, t, i] for i in range(num_interviewers)) <= 1)
-    
-    # CONSTRAINT 5: Each student gets exactly their target interviews
-    for s_idx, s in enumerate(students):
-        total_interviews = sum(x[s_idx, t, i] 
-                              for t in range(num_slots) 
-                              for i in range(num_interviewers))
-        model.Add(total_interviews == s['target'])
-    
-    # CONSTRAINT 6: No student sees the same interviewer twice
-    for s_idx in range(len(students)):
-        for i in range(num_interviewers):
-            model.Add(sum(x[s_idx, t, i] for t in range(num_slots)) <= 1)
-    
-    # CONSTRAINT 7: Each student has at least min_virtual_per_student virtual interviews
-    if virtual_interviewers and min_virtual_per_student > 0:
-        for s_idx in range(len(students)):
-            virtual_interviews = sum(x[s_idx, t, i] 
-                                    for t in range(num_slots) 
-                                    for i in virtual_interviewers)
-            model.Add(virtual_interviews >= min_virtual_per_student)
-            
-            # Constraint: Max virtual interviews
-            if max_virtual_per_student >= min_virtual_per_student:
-                model.Add(virtual_interviews <= max_virtual_per_student)
+    # Warm start from a greedy assignment. Written straight into the proto
+    # (x[s, t, i] are variables 0..n-1) rather than one AddHint call per variable.
+    hint = _greedy_hint(targets, virtual_interviewers, num_interviewers, num_slots,
+                        breaks_min, min_virtual_per_student, max_virtual_per_student, seed)
+    model.proto.solution_hint.vars.extend(range(len(hint)))
+    model.proto.solution_hint.values.extend(hint)
     
     # Solve
     solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = 60.0
+    solver.parameters.max_time_in_seconds = SOLVER_TIME_LIMIT
+    # Pure feasibility model (no objective): the first solution is the answer
+    solver.parameters.stop_after_first_solution = True
+    solver.parameters.num_workers = SOLVER_WORKERS
+    solver.parameters.log_search_progress = False
     
     if seed is not None:
         solver.parameters.random_seed = seed
@@ -135,35 +379,35 @@ def solve_schedule(
     status = solver.Solve(model)
     
     if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        # Extract schedule
+        # Extract schedule. The solution vector comes back in one call instead
+        # of a solver.Value() round trip per variable; x[s, t, i] leads it in
+        # (student, slot, interviewer) order (see _build_model), so each run
+        # of num_interviewers values is one student's slot.
+        x_values = list(solver.ResponseProto().solution)
+        
         schedule = {}
-        for s_idx, s in enumerate(students):
-            schedule[s['name']] = []
+        start = 0
+        for student_name in student_names:
+            slots = []
             for t in range(num_slots):
-                assigned = None
-                for i in range(num_interviewers):
-                    if solver.Value(x[s_idx, t, i]) == 1:
-                        assigned = interviewers[i]['name']
-                        break
-                schedule[s['name']].append(assigned)
+                cell = x_values[start:start + num_interviewers]
+                start += num_interviewers
+                slots.append(interviewer_names[cell.index(1)] if 1 in cell else None)
+            schedule[student_name] = slots
         
-        # Calculate stats
-        interviewer_schedule = {}
-        for i in range(num_interviewers):
-            inv_name = interviewers[i]['name']
-            interviewer_schedule[inv_name] = []
-            for t in range(num_slots):
-                # Check for break using the break variable
-                if solver.Value(breaks[i, t]) == 1:
-                    interviewer_schedule[inv_name].append("BREAK")
-                else:
-                    # Check for student
-                    found_student = None
-                    for s_idx, s in enumerate(students):
-                        if solver.Value(x[s_idx, t, i]) == 1:
-                            found_student = s['name']
-                            break
-                    interviewer_schedule[inv_name].append(found_student)
+        # Invert the student schedule into each interviewer's day
+        interviewer_schedule = {inv_name: [None] * num_slots for inv_name in interviewer_names}
+        for student_name, slots in schedule.items():
+            for t, inv_name in enumerate(slots):
+                if inv_name is not None:
+                    interviewer_schedule[inv_name][t] = student_name
+        
+        # Up to breaks_max idle slots become breaks (the model guarantees at
+        # least breaks_min); any further idle slots stay empty
+        for slots in interviewer_schedule.values():
+            idle = [t for t, student_name in enumerate(slots) if student_name is None]
+            for t in idle[:breaks_max]:
+                slots[t] = "BREAK"
 
         stats = {
             'total_interviews': sum(1 for s in schedule.values() for slot in s if slot),
@@ -193,36 +437,43 @@ def solve_schedule(
 def validate_schedule(schedule: dict, students: list[dict], interviewers: list[dict], 
                       num_slots: int, min_virtual: int = 1, max_virtual: int = 1) -> list[str]:
     """Validate a schedule meets all constraints."""
-    errors = []
-    
     virtual_names = {inv['name'] for inv in interviewers if inv['is_virtual']}
+    # Bound membership test, so the per-student virtual count runs in C via map()
+    is_virtual_name = virtual_names.__contains__
     student_targets = {s['name']: s['target'] for s in students}
     
-    # Check interview counts
+    # One pass over the students covers the three per-student checks; the
+    # messages are kept in separate lists so they come out grouped by check
+    count_errors = []
+    virtual_errors = []
+    duplicate_errors = []
     for name, slots in schedule.items():
-        actual = sum(1 for s in slots if s)
+        assigned = [s for s in slots if s]
+        
+        # Check interview counts
+        actual = len(assigned)
         expected = student_targets.get(name, 0)
         if actual != expected:
-            errors.append(f"{name}: got {actual} interviews, expected {expected}")
-    
-    # Check virtual requirement
-    for name, slots in schedule.items():
-        virt = sum(1 for s in slots if s in virtual_names)
+            count_errors.append(f"{name}: got {actual} interviews, expected {expected}")
+        
+        # Check virtual requirement
+        virt = sum(map(is_virtual_name, assigned))
         if virt < min_virtual:
-            errors.append(f"{name}: only {virt} virtual interviews, need {min_virtual}")
+            virtual_errors.append(f"{name}: only {virt} virtual interviews, need {min_virtual}")
         if virt > max_virtual:
-            errors.append(f"{name}: got {virt} virtual interviews, max allowed is {max_virtual}")
-    
-    # Check no duplicate interviewers per student
-    for name, slots in schedule.items():
-        assigned = [s for s in slots if s]
-        if len(assigned) != len(set(assigned)):
-            errors.append(f"{name}: sees same interviewer twice")
+            virtual_errors.append(f"{name}: got {virt} virtual interviews, max allowed is {max_virtual}")
+        
+        # Check no duplicate interviewers per student
+        if actual != len(set(assigned)):
+            duplicate_errors.append(f"{name}: sees same interviewer twice")
     
-    # Check no double-booking per slot
-    for t in range(num_slots):
-        slot_invs = [schedule[name][t] for name in schedule if schedule[name][t]]
+    # Check no double-booking per slot, reading the schedule column-wise
+    booking_errors = []
+    for t, column in enumerate(zip(*schedule.values())):
+        if t >= num_slots:
+            break
+        slot_invs = [s for s in column if s]
         if len(slot_invs) != len(set(slot_invs)):
-            errors.append(f"Slot #{t+1}: interviewer double-booked")
+            booking_errors.append(f"Slot #{t+1}: interviewer double-booked")
     
-    return errors
+    return count_errors + virtual_errors + duplicate_errors + booking_errors
@@ -469,14 +469,20 @@ async function processBulkAdd() {
             body: JSON.stringify({ students: names, default_target: defaultTarget })
         });
 
-        const newStudents = await response.json();
-        newStudents.forEach(s => {
+        const { added, skipped } = await response.json();
+        added.forEach(s => {
             students.push({ id: s.id, name: s.name, target: s.target });
         });
 
         renderStudents();
         closeBulkModal();
 
+        if (skipped.length > 0) {
+            showMessage('Duplicates Skipped',
+                `${skipped.length} name(s) were already on the list and were not added: ` +
+                skipped.map(escapeHtml).join(', '));
+        }
+
     } catch (err) {
         showError('Failed to add students: ' + err.message);
     }